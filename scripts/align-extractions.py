@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Cross-check PDF extraction (extract-chapters.py) against FB2 extraction (parse-fb2.ts).
+
+Aligns paragraphs of each volume (see lamrim_corpus/align.py) and reports per
+PDF chapter:
+- changed: paragraphs that differ between the two (merged headers, lost verse)
+- extra: paragraphs only in the PDF output
+- missing: paragraphs only in the FB2 output
+- layout: matched paragraphs that are a blockquote on one side only
+  (headings are not compared: parse-fb2.ts does not produce them)
+- [^N] markers missing from or extra in the PDF output
+
+Typical run:
+    npx tsx scripts/parse-fb2.ts lamrim_2.fb2 2 /tmp/fb2/volumes
+    python3 scripts/align-extractions.py --fb2-dir /tmp/fb2/volumes
+
+Exits with status 1 when mismatches exceed --max-mismatches or
+--max-marker-issues (both 0 by default), or --max-layout-mismatches if given,
+so it can be used as a quality gate after extraction; extract-chapters.py
+--align-with applies the same check. A missing or empty volume directory on
+either side is an error.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+from lamrim_corpus.align import add_alignment_arguments, align_volumes, check_limits, print_volume_report
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Align PDF and FB2 extractions paragraph by paragraph')
+    parser.add_argument('--pdf-dir', default='src/content/volumes', help='Volumes directory of PDF extraction')
+    parser.add_argument('--fb2-dir', required=True, help='Volumes directory of FB2 extraction')
+    parser.add_argument('--volume', type=int, help='Check only specified volume')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Show every mismatch')
+    add_alignment_arguments(parser)
+
+    args = parser.parse_args()
+
+    pdf_root = Path(args.pdf_dir)
+    fb2_root = Path(args.fb2_dir)
+
+    if args.volume:
+        volume_ids = [str(args.volume)]
+    else:
+        volume_ids = sorted(
+            (d.name.split('-', 1)[1] for d in pdf_root.glob('volume-*')
+             if d.is_dir() and (fb2_root / d.name).is_dir()),
+            key=int,
+        )
+
+    if not volume_ids:
+        print(f"No volumes present in both {pdf_root} and {fb2_root}", file=sys.stderr)
+        sys.exit(1)
+
+    total_mismatches = 0
+    total_layout = 0
+    total_marker_issues = 0
+    started = time.perf_counter()
+
+    for volume_id in volume_ids:
+        try:
+            reports, pdf_paras, fb2_paras = align_volumes(
+                pdf_root / f'volume-{volume_id}', fb2_root / f'volume-{volume_id}', volume_id)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        mismatches, layout, marker_issues = print_volume_report(
+            volume_id, reports, pdf_paras, fb2_paras, verbose=args.verbose)
+        total_mismatches += mismatches
+        total_layout += layout
+        total_marker_issues += marker_issues
+
+    print(f"\nAligned in {time.perf_counter() - started:.2f}s")
+
+    if not check_limits(args, total_mismatches, total_layout, total_marker_issues):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
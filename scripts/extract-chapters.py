@@ -9,14 +9,18 @@ Features:
 - Bold-italic section headers
 - Inline footnote markers as [^N]
 - Hyphenated word joining across lines
+- Adjacent italic/bold spans merged into one emphasis run
+- Optional low-memory mode for very large PDFs (see pdf_pages.py)
 """
 
-import fitz
 import re
 import sys
 import os
 from dataclasses import dataclass
 
+from pdf_pages import PageReader, add_memory_arguments, memory_options_from_args, format_memory_report
+from lamrim_corpus.align import add_alignment_arguments, align_volumes, check_limits, print_volume_report
+
 
 # Chapter definitions: (title, start_page, end_page, slug, start_marker, end_marker)
 # Pages are 0-indexed
@@ -97,6 +101,7 @@ HEADER_TOP_MARGIN = 55  # Y position - anything above is header
 FOOTNOTE_BOTTOM_MARGIN = 510  # Y position - footnotes at very bottom (page height ~538)
 SPACE_THRESHOLD = 2.0  # Gap between spans that indicates a space
 SUBHEADING_FONT_SIZE = 10.5  # Font size threshold for subheadings vs poetry
+FOOTNOTE_STYLE = '^'  # Style of superscript footnote marker spans
 
 
 @dataclass
@@ -153,7 +158,7 @@ def is_leaf_number(text: str) -> bool:
     return bool(re.match(r'^\d+\s*[абв]?$', text.strip()))
 
 
-def extract_page(page, page_num: int, page_height: float) -> dict:
+def extract_page(page, page_num: int, page_height: float, text_flags: int = None) -> dict:
     """
     Extract structured content from a page.
     Returns: {
@@ -161,7 +166,7 @@ def extract_page(page, page_num: int, page_height: float) -> dict:
         'footnotes': dict of {number: definition}
     }
     """
-    blocks = page.get_text("dict")["blocks"]
+    blocks = page.get_text("dict", flags=text_flags)["blocks"]
 
     paragraphs = []
     footnotes = {}
@@ -298,18 +303,22 @@ def is_header_block(lines_data: list) -> bool:
 
 def process_normal_block(lines_data: list) -> str:
     """Process a normal text block, joining lines with proper spacing."""
-    result_parts = []
+    pieces = []
 
     for line_x, spans in lines_data:
-        line_text = process_line_spans(spans)
-        if line_text.strip():
-            # Skip leaf numbers
-            if is_leaf_number(line_text):
-                continue
-            result_parts.append(line_text)
+        line_pieces = line_span_pieces(spans)
+        if not any(text.strip() for style, text in line_pieces):
+            continue
+        # Skip leaf numbers
+        if is_plain_line(line_pieces) and is_leaf_number(''.join(text for style, text in line_pieces)):
+            continue
+
+        if pieces and not join_hyphenated_pieces(pieces, line_pieces):
+            # Join lines with space (normal paragraph flow)
+            pieces.append(['', ' '])
+        pieces.extend(line_pieces)
 
-    # Join lines with space (normal paragraph flow)
-    text = ' '.join(result_parts)
+    text = render_style_runs(pieces)
 
     # Clean up multiple spaces
     text = re.sub(r'  +', ' ', text)
@@ -387,52 +396,114 @@ def replace_tibetan_ornaments(text: str) -> str:
     return text.strip()
 
 
-def process_line_spans(spans: list) -> str:
-    """
-    Process spans in a line, adding proper spacing between them.
-    Also handles italic/bold formatting and footnote markers.
-    """
-    if not spans:
-        return ''
+def span_style(span: Span) -> str:
+    """Markdown marker for a span: '*', '**', FOOTNOTE_STYLE, or '' for plain text."""
+    if span.is_superscript:
+        return FOOTNOTE_STYLE
+    if span.is_italic and not span.is_bold:
+        return '*'
+    # Bold text (non-header)
+    if span.is_bold and not span.is_italic and span.size >= 10:
+        return '**'
+    return ''
 
-    parts = []
 
-    for i, span in enumerate(spans):
-        text = span.text
+def line_span_pieces(spans: list) -> list:
+    """Convert a line's spans to [style, text] pieces."""
+    pieces = []
 
+    for span in spans:
         # Skip TibetanMachine ornamental characters
         if 'TibetanMachine' in span.font:
             continue
+        pieces.append([span_style(span), span.text])
+
+    return pieces
+
+
+def is_plain_line(pieces: list) -> bool:
+    """True if a line has no emphasis or footnote markers."""
+    return all(style == '' or not text.strip() for style, text in pieces)
+
+
+def join_hyphenated_pieces(pieces: list, next_pieces: list) -> bool:
+    """
+    If the text so far ends with a word hyphenated at the line break and the
+    next line continues it, drop the hyphen so the word is joined without a
+    space. Works on pieces so the two halves can end up in one style run.
+    """
+    last = next((piece for piece in reversed(pieces) if piece[1].strip()), None)
+    first = next((text for style, text in next_pieces if text.strip()), None)
+    if last is None or first is None or last[0] == FOOTNOTE_STYLE:
+        return False
+
+    tail = last[1].rstrip()
+    if not re.match(r'^[а-яёА-ЯЁ]', first.lstrip()):
+        return False
+    if tail.endswith('\u00ad') or re.search(r'[а-яёА-ЯЁ]-$', tail):
+        last[1] = tail[:-1]
+        # Whitespace after the hyphen belongs to the break
+        while pieces[-1] is not last:
+            pieces.pop()
+        for piece in next_pieces:
+            if piece[1].strip():
+                piece[1] = piece[1].lstrip()
+                break
+            piece[1] = ''
+        return True
+
+    return False
+
+
+def render_style_runs(pieces: list) -> str:
+    """
+    Render [style, text] pieces as markdown.
+
+    Adjacent pieces with the same style are merged into one run first
+    (whitespace-only pieces do not break a run), so each emphasis run gets
+    exactly one pair of markers and keeps its outer whitespace outside them.
+    """
+    runs = []
+    pending_space = ''
+
+    for style, text in pieces:
+        if not text.strip():
+            pending_space += text
+            continue
+        if runs and style == runs[-1][0] and style != FOOTNOTE_STYLE:
+            runs[-1][1] += pending_space + text
+        else:
+            if pending_space:
+                runs.append(['', pending_space])
+            runs.append([style, text])
+        pending_space = ''
+
+    if pending_space:
+        runs.append(['', pending_space])
 
-        # Handle footnote markers (superscript numbers)
-        if span.is_superscript:
+    parts = []
+    for style, text in runs:
+        if style == FOOTNOTE_STYLE:
             parts.append(f'[^{text.strip()}]')
-        # Handle italic text
-        elif span.is_italic and not span.is_bold:
-            stripped = text.strip()
-            if stripped:
-                # Preserve leading/trailing spaces outside the markers
-                prefix = ' ' if text.startswith(' ') or (text and text[0] == ' ') else ''
-                suffix = ' ' if text.endswith(' ') or (text and text[-1] == ' ') else ''
-                parts.append(f'{prefix}*{stripped}*{suffix}')
-            elif text.strip() == '':
-                parts.append(text)  # Just whitespace
-        # Handle bold text (non-header)
-        elif span.is_bold and not span.is_italic:
+        elif style:
             stripped = text.strip()
-            if stripped and span.size >= 10:
-                prefix = ' ' if text.startswith(' ') else ''
-                suffix = ' ' if text.endswith(' ') else ''
-                parts.append(f'{prefix}**{stripped}**{suffix}')
-            else:
-                parts.append(text)
+            # Preserve leading/trailing spaces outside the markers
+            prefix = text[:len(text) - len(text.lstrip())]
+            suffix = text[len(text.rstrip()):]
+            parts.append(f'{prefix}{style}{stripped}{style}{suffix}')
         else:
             parts.append(text)
 
     # Join parts - no automatic space adding, rely on original spacing
-    result = ''.join(parts)
+    return ''.join(parts)
 
-    return result
+
+def process_line_spans(spans: list) -> str:
+    """
+    Process spans in a line, adding proper spacing between them.
+    Also handles italic/bold formatting and footnote markers.
+    """
+    return render_style_runs(line_span_pieces(spans))
 
 
 def join_hyphenated(text: str) -> str:
@@ -460,13 +531,6 @@ def clean_markdown(text: str) -> str:
     # Join hyphenated words
     text = join_hyphenated(text)
 
-    # Join split italic words: *word* *part* -> *wordpart*
-    # This handles words hyphenated across lines that were formatted separately
-    text = re.sub(r'\*([а-яёА-ЯЁa-zA-Z]+)\*\s*\*([а-яёА-ЯЁa-zA-Z]+)\*', r'*\1\2*', text)
-
-    # Also join: *word**part* -> *wordpart* (no space variant)
-    text = re.sub(r'\*([а-яёА-ЯЁa-zA-Z]+)\*\*([а-яёА-ЯЁa-zA-Z]+)\*', r'*\1\2*', text)
-
     # Add space before [ if missing
     text = re.sub(r'([а-яёА-ЯЁa-zA-Z])\[', r'\1 [', text)
 
@@ -495,7 +559,7 @@ def format_poetry_as_blockquote(text: str) -> str:
     return text
 
 
-def extract_chapter(doc, start_page: int, end_page: int, title: str, start_marker: str = None, end_marker: str = None) -> str:
+def extract_chapter(reader: PageReader, start_page: int, end_page: int, title: str, start_marker: str = None, end_marker: str = None) -> str:
     """Extract a single chapter from the PDF.
 
     Args:
@@ -511,10 +575,8 @@ def extract_chapter(doc, start_page: int, end_page: int, title: str, start_marke
         if found_end:
             break
 
-        page = doc[page_num]
-        page_height = page.rect.height
-
-        result = extract_page(page, page_num, page_height)
+        result = reader.process(
+            page_num, lambda page: extract_page(page, page_num, page.rect.height, reader.dict_flags))
 
         for para_text, is_poetry, is_header, is_subheading in result['paragraphs']:
             # Check for end marker first
@@ -553,6 +615,27 @@ def extract_chapter(doc, start_page: int, end_page: int, title: str, start_marke
     return content
 
 
+def check_alignment(args, output_dir: str, filenames: set) -> bool:
+    """Align the chapters just written against FB2 output; False if over the --max-* limits."""
+    try:
+        reports, pdf_paras, fb2_paras = align_volumes(
+            output_dir, os.path.join(args.align_with, f'volume-{args.volume}'), str(args.volume),
+            chapters=filenames)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return False
+
+    print()
+    print("Alignment with FB2:")
+    mismatches, layout, marker_issues = print_volume_report(
+        str(args.volume), reports, pdf_paras, fb2_paras, only_problems=True)
+
+    ok = check_limits(args, mismatches, layout, marker_issues)
+    if not ok:
+        print("See scripts/align-extractions.py -v for details", file=sys.stderr)
+    return ok
+
+
 def main():
     import argparse
 
@@ -562,6 +645,10 @@ def main():
     parser.add_argument('--output-dir', '-o', default='src/content/volumes', help='Output directory')
     parser.add_argument('--chapters', type=str, help='Comma-separated chapter indices (1-based)')
     parser.add_argument('--list', action='store_true', help='List available chapters')
+    parser.add_argument('--align-with', metavar='VOLUMES_DIR',
+                        help='FB2 volumes directory to cross-check the extracted chapters against')
+    add_memory_arguments(parser)
+    add_alignment_arguments(parser)
 
     args = parser.parse_args()
 
@@ -587,7 +674,7 @@ def main():
         selected = [(i, chapters[i]) for i in range(min(5, len(chapters)))]
 
     # Open PDF
-    doc = fitz.open(args.pdf_path)
+    reader = PageReader(args.pdf_path, memory_options_from_args(args))
 
     # Create output directory
     output_dir = os.path.join(args.output_dir, f'volume-{args.volume}')
@@ -596,11 +683,13 @@ def main():
     print(f"Extracting {len(selected)} chapters to {output_dir}")
     print()
 
+    written = set()
+
     for idx, (chapter_idx, (title, start, end, slug, start_marker, end_marker)) in enumerate(selected, 1):
         chapter_num = chapter_idx + 1  # 1-based chapter number
         print(f"  [{idx}/{len(selected)}] Chapter {chapter_num}: {title}...", end=" ", flush=True)
 
-        content = extract_chapter(doc, start, end, title, start_marker, end_marker)
+        content = extract_chapter(reader, start, end, title, start_marker, end_marker)
 
         # Write file with correct chapter number
         filename = f"{chapter_num:02d}-{slug}.md"
@@ -608,12 +697,18 @@ def main():
 
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(content)
+        written.add(filename)
 
         print(f"✓ ({len(content)} chars)")
 
-    doc.close()
+    reader.close()
 
     print()
+    print(format_memory_report(reader))
+
+    if args.align_with and not check_alignment(args, output_dir, written):
+        sys.exit(1)
+
     print("Done!")
 
 
@@ -5,24 +5,25 @@ Footnotes start at PDF page 512 and continue to ~page 700.
 Output: JSON file with {number: text} mapping.
 """
 
-import fitz
 import re
 import json
 import sys
 
+from pdf_pages import MemoryOptions, PageReader, add_memory_arguments, memory_options_from_args, format_memory_report
 
-def extract_footnotes(pdf_path: str, start_page: int = 512, end_page: int = 700) -> dict:
+
+def extract_footnotes(pdf_path: str, start_page: int = 512, end_page: int = 700,
+                      memory: MemoryOptions = None) -> dict:
     """Extract footnotes from PDF."""
-    doc = fitz.open(pdf_path)
+    reader = PageReader(pdf_path, memory)
 
     footnotes = {}
     current_num = None
     current_text = []
 
     # Extract text from footnotes pages
-    for page_num in range(start_page, min(end_page, len(doc))):
-        page = doc[page_num]
-        text = page.get_text()
+    for page_num in range(start_page, min(end_page, len(reader))):
+        text = reader.text(page_num)
 
         # Skip pages that are clearly not footnotes (appendix, glossary, index)
         if 'ПРИЛОЖЕНИЯ' in text:
@@ -115,7 +116,8 @@ def extract_footnotes(pdf_path: str, start_page: int = 512, end_page: int = 700)
         if fn_text:
             footnotes[current_num] = fn_text
 
-    doc.close()
+    reader.close()
+    print(format_memory_report(reader))
     return footnotes
 
 
@@ -127,13 +129,14 @@ def main():
     parser.add_argument('--output', '-o', default='src/content/footnotes.json', help='Output JSON file')
     parser.add_argument('--start', type=int, default=512, help='Start page (0-indexed)')
     parser.add_argument('--end', type=int, default=700, help='End page (0-indexed)')
+    add_memory_arguments(parser)
 
     args = parser.parse_args()
 
     print(f"Extracting footnotes from {args.pdf_path}")
     print(f"Pages {args.start} to {args.end}")
 
-    footnotes = extract_footnotes(args.pdf_path, args.start, args.end)
+    footnotes = extract_footnotes(args.pdf_path, args.start, args.end, memory_options_from_args(args))
 
     print(f"\nExtracted {len(footnotes)} footnotes")
 
@@ -0,0 +1,106 @@
+"""
+Read-only access to the extracted corpus in src/content.
+
+Usage (from scripts/):
+
+    from lamrim_corpus import Corpus
+
+    corpus = Corpus()
+    section = corpus.section('2-05')            # or corpus.section('opredelenie-obekta-otritsaniya')
+    section.title
+    section.paragraph(10)
+    corpus.footnote(575)
+    corpus.section_for_page(1100)               # -> Section 2-06
+
+Nothing is read at import time. Files are memory-mapped on first access,
+paragraph and footnote offsets are indexed lazily, and decoded paragraphs
+and footnotes are kept in LRU caches.
+"""
+
+import re
+from pathlib import Path
+
+from .footnotes import FootnoteIndex
+from .pages import BOOK_PAGES, find_chapter_by_page
+from .sections import Section, Volume
+
+
+DEFAULT_CONTENT_DIR = Path(__file__).resolve().parents[2] / 'src' / 'content'
+VOLUME_DIR_PATTERN = re.compile(r'^volume-(\d+)$')
+
+__all__ = [
+    'Corpus',
+    'Volume',
+    'Section',
+    'FootnoteIndex',
+    'BOOK_PAGES',
+    'find_chapter_by_page',
+]
+
+
+class Corpus:
+    """The whole corpus: volumes, sections and footnotes."""
+
+    def __init__(self, content_dir: str | Path = DEFAULT_CONTENT_DIR):
+        self.content_dir = Path(content_dir)
+        self._volumes = None
+        self._by_key = None
+        self._footnotes = None
+
+    @property
+    def volumes(self) -> list[Volume]:
+        if self._volumes is None:
+            volumes = []
+            volumes_dir = self.content_dir / 'volumes'
+            for volume_dir in volumes_dir.iterdir():
+                match = VOLUME_DIR_PATTERN.match(volume_dir.name)
+                if match and volume_dir.is_dir():
+                    volumes.append(Volume(match.group(1), volume_dir))
+            self._volumes = sorted(volumes, key=lambda v: int(v.id))
+        return self._volumes
+
+    def sections(self):
+        """Iterate over all sections in reading order."""
+        for volume in self.volumes:
+            yield from volume.sections
+
+    def section(self, key: str) -> Section:
+        """Section by id ("2-05") or slug ("opredelenie-obekta-otritsaniya")."""
+        if self._by_key is None:
+            self._by_key = {}
+            for section in self.sections():
+                self._by_key[section.id] = section
+                self._by_key.setdefault(section.slug, section)
+        try:
+            return self._by_key[key]
+        except KeyError:
+            raise KeyError(f'Unknown section: {key}') from None
+
+    @property
+    def footnotes(self) -> FootnoteIndex:
+        if self._footnotes is None:
+            self._footnotes = FootnoteIndex(self.content_dir / 'footnotes.json')
+        return self._footnotes
+
+    def footnote(self, number: int) -> str:
+        """Footnote text by number."""
+        return self.footnotes[number]
+
+    def section_for_page(self, page_num: int) -> Section | None:
+        """Section that contains the given printed book page."""
+        chapter = find_chapter_by_page(page_num)
+        if chapter is None:
+            return None
+        return self.section(chapter[1])
+
+    def close(self):
+        for section in self.sections():
+            section.close()
+        if self._footnotes is not None:
+            self._footnotes.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
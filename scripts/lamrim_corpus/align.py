@@ -0,0 +1,385 @@
+"""
+Paragraph alignment between two extractions of the same volume
+(extract-chapters.py from the PDF, parse-fb2.ts from the FB2).
+
+Paragraphs are normalised (markdown, footnote markers, whitespace, dashes
+and quotes removed or unified) and compared by hash. Alignment is
+patience-diff style: paragraphs that occur exactly once on both sides are
+anchors, the longest increasing run of anchors is kept, and only the gaps
+between anchors are aligned again. Nothing is compared pairwise, so whole
+volumes align in well under a second.
+
+The hash ignores layout, so block kinds of matched pairs are compared
+separately and counted apart from text mismatches. parse-fb2.ts emits no
+headings and quotes any paragraph wrapped in quotation marks, while
+extract-chapters.py marks subheadings and indented verse, so only the
+blockquote/prose distinction is compared, and it has its own limit.
+
+Chapter boundaries differ between the two sources, so each volume is
+aligned as one sequence and results are reported per PDF chapter; a gap
+that runs across PDF chapters is split at their boundaries.
+"""
+
+import re
+import sys
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .sections import MARKER_PATTERN, Section, Volume
+
+
+PREVIEW_LENGTH = 80
+
+
+def paragraph_kind(text: str) -> str:
+    """Block kind of a paragraph: 'h1'..'h6', 'blockquote' or 'prose'."""
+    heading = re.match(r'^(#{1,6})\s', text)
+    if heading:
+        return f'h{len(heading.group(1))}'
+    if text.startswith('>'):
+        return 'blockquote'
+    return 'prose'
+
+
+def comparable_kinds(pdf_kind: str, fb2_kind: str) -> bool:
+    """Whether both extractors can produce these kinds (parse-fb2.ts has no headings)."""
+    return not (pdf_kind.startswith('h') or fb2_kind.startswith('h'))
+
+
+def normalize_paragraph(text: str) -> str:
+    """Reduce a paragraph to the text both extractions should agree on (layout-agnostic)."""
+    text = MARKER_PATTERN.sub('', text)
+    text = re.sub(r'^(?:>\s?|#+\s)', '', text, flags=re.MULTILINE)
+    text = text.replace('\u00ad', '')
+    text = re.sub(r'[*_]', '', text)
+    text = text.replace('ё', 'е').replace('Ё', 'Е')
+    # parse-fb2.ts turns '?' into '—'
+    text = re.sub(r'[?—–-]', '-', text)
+    text = re.sub(r'[«»“”„"]', '"', text)
+    text = re.sub(r'\s+', '', text)
+    return text.lower()
+
+
+def unique_anchors(a: list, alo: int, ahi: int, b: list, blo: int, bhi: int) -> list:
+    """Longest increasing run of (i, j) pairs for items unique in both ranges."""
+    count_a = Counter(a[alo:ahi])
+    count_b = Counter(b[blo:bhi])
+    b_pos = {b[j]: j for j in range(blo, bhi) if count_b[b[j]] == 1}
+
+    pairs = [(i, b_pos[a[i]]) for i in range(alo, ahi) if count_a[a[i]] == 1 and a[i] in b_pos]
+    if not pairs:
+        return []
+
+    # Patience sorting: longest increasing subsequence of j
+    tails = []      # smallest tail j of an increasing run of each length
+    tail_idx = []   # index into pairs of that tail
+    prev = [-1] * len(pairs)
+    for k, (i, j) in enumerate(pairs):
+        pos = bisect_left(tails, j)
+        if pos == len(tails):
+            tails.append(j)
+            tail_idx.append(k)
+        else:
+            tails[pos] = j
+            tail_idx[pos] = k
+        prev[k] = tail_idx[pos - 1] if pos > 0 else -1
+
+    result = []
+    k = tail_idx[-1]
+    while k != -1:
+        result.append(pairs[k])
+        k = prev[k]
+    result.reverse()
+    return result
+
+
+def align_sequences(a: list, b: list) -> list:
+    """Matched (i, j) index pairs between two sequences, in order."""
+    matches = []
+    stack = [(0, len(a), 0, len(b))]
+
+    while stack:
+        alo, ahi, blo, bhi = stack.pop()
+
+        # Common prefix and suffix
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            matches.append((alo, blo))
+            alo += 1
+            blo += 1
+        while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+            ahi -= 1
+            bhi -= 1
+            matches.append((ahi, bhi))
+
+        if alo == ahi or blo == bhi:
+            continue
+
+        anchors = unique_anchors(a, alo, ahi, b, blo, bhi)
+        prev_i, prev_j = alo, blo
+        for i, j in anchors:
+            matches.append((i, j))
+            stack.append((prev_i, i, prev_j, j))
+            prev_i, prev_j = i + 1, j + 1
+        if anchors:
+            stack.append((prev_i, ahi, prev_j, bhi))
+        # No anchors: the range stays an unmatched gap
+
+    matches.sort()
+    return matches
+
+
+@dataclass
+class Gap:
+    """Unmatched paragraphs between two matches: PDF a[i0:i1], FB2 b[j0:j1]."""
+    i0: int
+    i1: int
+    j0: int
+    j1: int
+
+    @property
+    def kind(self) -> str:
+        if self.i0 == self.i1:
+            return 'missing'  # Only in FB2
+        if self.j0 == self.j1:
+            return 'extra'    # Only in PDF
+        return 'changed'
+
+
+@dataclass
+class KindMismatch:
+    """Matched paragraphs whose block kinds differ: PDF a[i], FB2 b[j]."""
+    i: int
+    j: int
+    pdf_kind: str
+    fb2_kind: str
+
+
+@dataclass
+class ChapterReport:
+    section: Section
+    paragraphs: int = 0
+    matched: int = 0
+    gaps: list = field(default_factory=list)
+    kind_mismatches: list = field(default_factory=list)
+    missing_markers: Counter = field(default_factory=Counter)  # In FB2, not in PDF
+    extra_markers: Counter = field(default_factory=Counter)    # In PDF, not in FB2
+
+    @property
+    def mismatches(self) -> int:
+        return len(self.gaps)
+
+    @property
+    def layout_mismatches(self) -> int:
+        return len(self.kind_mismatches)
+
+    @property
+    def marker_issues(self) -> int:
+        return sum(self.missing_markers.values()) + sum(self.extra_markers.values())
+
+
+def volume_paragraphs(sections: list) -> tuple[list, list]:
+    """All paragraphs of the sections and the index of the section each belongs to."""
+    paragraphs = []
+    owners = []
+    for index, section in enumerate(sections):
+        for paragraph in section.paragraphs():
+            paragraphs.append(paragraph)
+            owners.append(index)
+    return paragraphs, owners
+
+
+def split_gap(gap: Gap, owners: list) -> list:
+    """Split a gap at PDF chapter boundaries, sharing FB2 paragraphs out in proportion."""
+    if gap.i0 == gap.i1:
+        return [gap]
+    bounds = [gap.i0] + [i for i in range(gap.i0 + 1, gap.i1) if owners[i] != owners[i - 1]] + [gap.i1]
+    pdf_length = gap.i1 - gap.i0
+    fb2_length = gap.j1 - gap.j0
+    js = [gap.j0 + (i - gap.i0) * fb2_length // pdf_length for i in bounds]
+    return [Gap(bounds[k], bounds[k + 1], js[k], js[k + 1]) for k in range(len(bounds) - 1)]
+
+
+def count_markers(texts: list) -> Counter:
+    return Counter(m for text in texts for m in MARKER_PATTERN.findall(text))
+
+
+def compare_markers(parts: list, pdf_paras: list, fb2_paras: list, fb2_outside: list = ()):
+    """
+    Compare [^N] markers over (report, gap) parts taken together and charge
+    each difference to the report of the part it occurs in. Markers in
+    fb2_outside (FB2 text that may belong to chapters outside the selection)
+    excuse PDF markers but are never reported as missing.
+    """
+    pdf_counts = [count_markers(pdf_paras[gap.i0:gap.i1]) for _, gap in parts]
+    fb2_counts = [count_markers(fb2_paras[gap.j0:gap.j1]) for _, gap in parts]
+    pdf_total = sum(pdf_counts, Counter())
+    fb2_total = sum(fb2_counts, Counter())
+
+    extra = pdf_total - fb2_total - count_markers(fb2_outside)
+    missing = fb2_total - pdf_total
+    for (report, _), pdf_markers, fb2_markers in zip(parts, pdf_counts, fb2_counts):
+        charged = pdf_markers & extra
+        report.extra_markers.update(charged)
+        extra -= charged
+        charged = fb2_markers & missing
+        report.missing_markers.update(charged)
+        missing -= charged
+
+
+def align_volumes(pdf_dir: Path, fb2_dir: Path, volume_id: str,
+                  chapters: set | None = None) -> tuple[list, list, list]:
+    """
+    Align one volume of PDF output against FB2 output.
+
+    chapters limits the PDF side to these chapter file names; other files in
+    pdf_dir are ignored. FB2 text next to the edges of such a selection may
+    belong to chapters that were left out, so unmatched FB2 paragraphs there
+    are not reported.
+
+    Raises ValueError if either directory has no chapter files.
+    Returns: (chapter reports, PDF paragraphs, FB2 paragraphs)
+    """
+    sections = Volume(volume_id, pdf_dir).sections
+    if chapters is not None:
+        sections = [section for section in sections if section.path.name in chapters]
+    fb2_sections = Volume(volume_id, fb2_dir).sections
+    for path, found in ((pdf_dir, sections), (fb2_dir, fb2_sections)):
+        if not found:
+            raise ValueError(f"No chapter files in {path}")
+
+    pdf_paras, owners = volume_paragraphs(sections)
+    fb2_paras, _ = volume_paragraphs(fb2_sections)
+
+    a = [normalize_paragraph(p) for p in pdf_paras]
+    b = [normalize_paragraph(p) for p in fb2_paras]
+
+    reports = [ChapterReport(section) for section in sections]
+    for owner in owners:
+        reports[owner].paragraphs += 1
+
+    def report_at(i: int) -> ChapterReport:
+        if not owners:
+            return reports[0]
+        return reports[owners[min(max(i, 0), len(owners) - 1)]]
+
+    # Positions where the selection leaves chapters out (or the volume may go on)
+    edges = set()
+    if chapters is not None:
+        edges = {0, len(a)} | {i for i in range(1, len(owners))
+                               if sections[owners[i]].order != sections[owners[i - 1]].order + 1}
+
+    prev_i, prev_j = 0, 0
+    for i, j in align_sequences(a, b) + [(len(a), len(b))]:
+        if i > prev_i or j > prev_j:
+            fb2_outside = []
+            gap = Gap(prev_i, i, prev_j, j)
+            if any(prev_i <= edge <= i for edge in edges):
+                fb2_outside = fb2_paras[prev_j:j]
+                gap.j1 = gap.j0
+            if i > prev_i:
+                parts = [(reports[owners[part.i0]], part) for part in split_gap(gap, owners)]
+            else:
+                # Only in FB2: the chapter of the preceding paragraph
+                parts = [] if fb2_outside else [(report_at(prev_i - 1), gap)]
+            for report, part in parts:
+                report.gaps.append(part)
+            compare_markers(parts, pdf_paras, fb2_paras, fb2_outside)
+        if i < len(a):
+            report = reports[owners[i]]
+            report.matched += 1
+            compare_markers([(report, Gap(i, i + 1, j, j + 1))], pdf_paras, fb2_paras)
+            pdf_kind, fb2_kind = paragraph_kind(pdf_paras[i]), paragraph_kind(fb2_paras[j])
+            if pdf_kind != fb2_kind and comparable_kinds(pdf_kind, fb2_kind):
+                report.kind_mismatches.append(KindMismatch(i, j, pdf_kind, fb2_kind))
+        prev_i, prev_j = i + 1, j + 1
+
+    return reports, pdf_paras, fb2_paras
+
+
+def preview(paragraphs: list, start: int, end: int) -> str:
+    if start == end:
+        return '—'
+    text = ' / '.join(p.replace('\n', ' ') for p in paragraphs[start:end])
+    return text[:PREVIEW_LENGTH] + ('...' if len(text) > PREVIEW_LENGTH else '')
+
+
+def format_markers(markers) -> str:
+    nums = sorted(markers, key=int)
+    shown = ', '.join(f'[^{n}]' for n in nums[:10])
+    return shown + ('...' if len(nums) > 10 else '')
+
+
+def print_volume_report(volume_id: str, reports: list, pdf_paras: list, fb2_paras: list,
+                        verbose: bool = False, only_problems: bool = False) -> tuple[int, int, int]:
+    """
+    Print per-chapter results of align_volumes().
+
+    Returns: (mismatches, layout mismatches, marker issues) for the volume
+    """
+    print(f"\nvolume-{volume_id}: {len(pdf_paras)} PDF / {len(fb2_paras)} FB2 paragraphs")
+
+    total_mismatches = 0
+    total_layout = 0
+    total_marker_issues = 0
+
+    for report in reports:
+        total_mismatches += report.mismatches
+        total_layout += report.layout_mismatches
+        total_marker_issues += report.marker_issues
+        if only_problems and not (report.mismatches or report.layout_mismatches or report.marker_issues):
+            continue
+
+        kinds = Counter(gap.kind for gap in report.gaps)
+        line = (f"  {report.section.path.name}: {report.matched}/{report.paragraphs} matched, "
+                f"{report.mismatches} mismatches ({kinds['changed']} changed, "
+                f"{kinds['extra']} extra, {kinds['missing']} missing), "
+                f"{report.layout_mismatches} layout")
+        if report.marker_issues:
+            line += (f", markers: {sum(report.missing_markers.values())} missing, "
+                     f"{sum(report.extra_markers.values())} extra")
+        print(line)
+
+        if verbose:
+            for gap in report.gaps:
+                print(f"    {gap.kind}: PDF ¶{gap.i0}-{gap.i1} «{preview(pdf_paras, gap.i0, gap.i1)}»")
+                print(f"    {' ' * len(gap.kind)}  FB2 ¶{gap.j0}-{gap.j1} «{preview(fb2_paras, gap.j0, gap.j1)}»")
+            for mismatch in report.kind_mismatches:
+                print(f"    layout: PDF ¶{mismatch.i} is {mismatch.pdf_kind}, FB2 ¶{mismatch.j} is "
+                      f"{mismatch.fb2_kind} «{preview(pdf_paras, mismatch.i, mismatch.i + 1)}»")
+            if report.missing_markers:
+                print(f"    missing markers: {format_markers(report.missing_markers)}")
+            if report.extra_markers:
+                print(f"    extra markers: {format_markers(report.extra_markers)}")
+
+    return total_mismatches, total_layout, total_marker_issues
+
+
+def add_alignment_arguments(parser):
+    """Add the quality gate limits shared by align-extractions.py and extract-chapters.py."""
+    group = parser.add_argument_group('alignment')
+    group.add_argument('--max-mismatches', type=int, default=0, metavar='N',
+                       help='Fail if paragraph mismatches exceed N (default: 0)')
+    group.add_argument('--max-layout-mismatches', type=int, metavar='N',
+                       help='Fail if blockquote/prose mismatches exceed N (default: not checked)')
+    group.add_argument('--max-marker-issues', type=int, default=0, metavar='N',
+                       help='Fail if missing/extra [^N] markers exceed N (default: 0)')
+
+
+def check_limits(args, mismatches: int, layout_mismatches: int, marker_issues: int) -> bool:
+    """Print totals and whether they are within the limits from add_alignment_arguments()."""
+    print(f"\nTotal: {mismatches} mismatches, {layout_mismatches} layout mismatches, "
+          f"{marker_issues} marker issues")
+
+    ok = True
+    if mismatches > args.max_mismatches:
+        print(f"FAIL: mismatches exceed {args.max_mismatches}", file=sys.stderr)
+        ok = False
+    if args.max_layout_mismatches is not None and layout_mismatches > args.max_layout_mismatches:
+        print(f"FAIL: layout mismatches exceed {args.max_layout_mismatches}", file=sys.stderr)
+        ok = False
+    if marker_issues > args.max_marker_issues:
+        print(f"FAIL: marker issues exceed {args.max_marker_issues}", file=sys.stderr)
+        ok = False
+    return ok
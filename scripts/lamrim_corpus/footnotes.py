@@ -0,0 +1,83 @@
+"""
+Footnote lookup over footnotes.json without loading the whole file.
+
+footnotes.json is written with json.dump(..., indent=2), so every entry is
+a single line of the form `  "N": "text",`. JSON strings cannot contain raw
+newlines, which makes the line start a reliable entry boundary.
+"""
+
+import json
+import re
+from array import array
+from functools import lru_cache
+from pathlib import Path
+
+from .mapped import MappedFile
+
+
+ENTRY_PATTERN = re.compile(rb'^  "(\d+)": ', re.MULTILINE)
+
+
+class FootnoteIndex:
+    """Footnote number -> text, backed by a memory-mapped footnotes.json."""
+
+    def __init__(self, path: Path, cache_size: int = 1024):
+        self.file = MappedFile(path)
+        self._numbers = None  # sorted footnote numbers
+        self._starts = None   # byte offset of each value
+        self._ends = None     # byte offset just past each value
+        self.get = lru_cache(maxsize=cache_size)(self._load)
+
+    def _build_index(self):
+        data = self.file.data
+        numbers = array('I')
+        starts = array('Q')
+        ends = array('Q')
+
+        for match in ENTRY_PATTERN.finditer(data):
+            if starts:
+                ends.append(match.start())
+            numbers.append(int(match.group(1)))
+            starts.append(match.end())
+        if starts:
+            ends.append(data.rfind(b'}'))
+
+        self._numbers = numbers
+        self._starts = starts
+        self._ends = ends
+        self._positions = {num: i for i, num in enumerate(numbers)}
+
+    def _ensure_index(self):
+        if self._numbers is None:
+            self._build_index()
+
+    def _load(self, number: int) -> str | None:
+        self._ensure_index()
+        i = self._positions.get(number)
+        if i is None:
+            return None
+        raw = self.file.text(self._starts[i], self._ends[i]).rstrip().rstrip(',')
+        return json.loads(raw)
+
+    def numbers(self) -> list[int]:
+        """All footnote numbers, in file order."""
+        self._ensure_index()
+        return list(self._numbers)
+
+    def __contains__(self, number: int) -> bool:
+        self._ensure_index()
+        return int(number) in self._positions
+
+    def __len__(self) -> int:
+        self._ensure_index()
+        return len(self._numbers)
+
+    def __getitem__(self, number: int) -> str:
+        text = self.get(int(number))
+        if text is None:
+            raise KeyError(number)
+        return text
+
+    def close(self):
+        self.get.cache_clear()
+        self.file.close()
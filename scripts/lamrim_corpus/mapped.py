@@ -0,0 +1,47 @@
+"""
+Read-only memory-mapped files.
+"""
+
+import mmap
+from pathlib import Path
+
+
+class MappedFile:
+    """A file mapped into memory on first access.
+
+    Slicing reads straight from the page cache, so looking up one paragraph
+    or footnote only touches the pages that hold it.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = None
+        self._map = None
+
+    @property
+    def data(self):
+        """The mapped bytes (mmap object, or b'' for an empty file)."""
+        if self._map is None:
+            self._file = open(self.path, 'rb')
+            try:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped
+                self._map = b''
+        return self._map
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def text(self, start: int = 0, end: int = None) -> str:
+        """Decode a byte range as UTF-8."""
+        data = self.data
+        return data[start:len(data) if end is None else end].decode('utf-8')
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        if self._file is not None:
+            self._file.close()
+        self._map = None
+        self._file = None
@@ -0,0 +1,163 @@
+"""
+Chapter files (src/content/volumes/volume-N/NN-slug.md) as sections.
+
+A chapter file is:
+
+    # Title
+
+    paragraph
+
+    paragraph
+    ...
+
+    ---
+
+    [^N]: footnote definition
+
+Paragraph offsets are found on first access and kept as byte offsets into
+the memory-mapped file; the text itself is decoded only when asked for.
+"""
+
+import json
+import re
+from array import array
+from functools import lru_cache
+from pathlib import Path
+
+from .mapped import MappedFile
+
+
+CHAPTER_FILE_PATTERN = re.compile(r'^(\d+)-(.+)\.md$')
+PARAGRAPH_BREAK = re.compile(rb'\n[ \t]*\n\s*')
+FOOTNOTES_SEPARATOR = b'\n---\n\n[^'
+MARKER_PATTERN = re.compile(r'\[\^(\d+)\]')  # Inline markers; definitions are past the body end
+
+
+class Section:
+    """One chapter file."""
+
+    def __init__(self, volume_id: str, order: int, slug: str, path: Path, cache_size: int = 256):
+        self.volume_id = volume_id
+        self.order = order
+        self.slug = slug
+        self.id = f'{volume_id}-{order:02d}'  # Same as section ids in src/content/index.ts
+        self.file = MappedFile(path)
+        self._starts = None
+        self._ends = None
+        self.paragraph = lru_cache(maxsize=cache_size)(self._load_paragraph)
+
+    def __repr__(self) -> str:
+        return f'Section({self.id!r}, {self.slug!r})'
+
+    @property
+    def path(self) -> Path:
+        return self.file.path
+
+    @property
+    def title(self) -> str:
+        """Title from the leading '# ' line."""
+        data = self.file.data
+        end = data.find(b'\n')
+        first_line = self.file.text(0, end if end != -1 else None)
+        return first_line[2:].strip() if first_line.startswith('# ') else first_line.strip()
+
+    @property
+    def text(self) -> str:
+        """Full markdown of the chapter."""
+        return self.file.text()
+
+    def _body_end(self) -> int:
+        data = self.file.data
+        end = data.rfind(FOOTNOTES_SEPARATOR)
+        return end if end != -1 else len(data)
+
+    def _build_index(self):
+        data = self.file.data
+        body_end = self._body_end()
+        starts = array('Q')
+        ends = array('Q')
+
+        # Skip the title line
+        pos = data.find(b'\n')
+        pos = body_end if pos == -1 else pos + 1
+
+        while pos < body_end:
+            match = PARAGRAPH_BREAK.search(data, pos, body_end)
+            end = match.start() if match else body_end
+            if data[pos:end].strip():
+                starts.append(pos)
+                ends.append(end)
+            if not match:
+                break
+            pos = match.end()
+
+        self._starts = starts
+        self._ends = ends
+
+    def _ensure_index(self):
+        if self._starts is None:
+            self._build_index()
+
+    def __len__(self) -> int:
+        """Number of paragraphs."""
+        self._ensure_index()
+        return len(self._starts)
+
+    def _load_paragraph(self, index: int) -> str:
+        self._ensure_index()
+        return self.file.text(self._starts[index], self._ends[index]).strip()
+
+    def paragraphs(self):
+        """Iterate over paragraphs (without the title and footnote definitions)."""
+        for i in range(len(self)):
+            yield self.paragraph(i)
+
+    def footnote_markers(self) -> list[int]:
+        """Footnote numbers referenced in the text, in order of first appearance."""
+        body = self.file.text(0, self._body_end())
+        seen = dict.fromkeys(int(num) for num in MARKER_PATTERN.findall(body))
+        return list(seen)
+
+    def close(self):
+        self.paragraph.cache_clear()
+        self.file.close()
+
+
+class Volume:
+    """One volume directory; _meta.json is optional."""
+
+    def __init__(self, volume_id: str, path: Path):
+        self.id = volume_id
+        self.path = Path(path)
+        self._sections = None
+        self._meta = None
+
+    def __repr__(self) -> str:
+        return f'Volume({self.id!r})'
+
+    @property
+    def meta(self) -> dict:
+        if self._meta is None:
+            meta_path = self.path / '_meta.json'
+            if meta_path.exists():
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    self._meta = json.load(f)
+            else:
+                self._meta = {'id': self.id}
+        return self._meta
+
+    @property
+    def title(self) -> str | None:
+        return self.meta.get('title')
+
+    @property
+    def sections(self) -> list[Section]:
+        """Sections sorted by chapter number (files are listed, not read)."""
+        if self._sections is None:
+            sections = []
+            for chapter_path in self.path.glob('*.md'):
+                match = CHAPTER_FILE_PATTERN.match(chapter_path.name)
+                if match:
+                    sections.append(Section(self.id, int(match.group(1)), match.group(2), chapter_path))
+            self._sections = sorted(sections, key=lambda s: s.order)
+        return self._sections
@@ -4,7 +4,10 @@
  * This script converts FB2 files to Markdown format with proper footnote linking.
  * FB2 is an XML-based ebook format commonly used for Russian books.
  *
- * Usage: npx tsx scripts/parse-fb2.ts <input.fb2> <volume-number>
+ * Usage: npx tsx scripts/parse-fb2.ts <input.fb2> <volume-number> [volumes-dir]
+ *
+ * volumes-dir defaults to src/content/volumes; pass another directory to keep
+ * the output apart for comparison with align-extractions.py.
  *
  * Features:
  * - Reads FB2 XML (handles windows-1251 encoding via iconv)
@@ -22,6 +25,7 @@ import { execSync } from 'child_process';
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = dirname(__filename);
 const projectRoot = join(__dirname, '..');
+const defaultVolumesDir = join(projectRoot, 'src', 'content', 'volumes');
 
 interface Chapter {
   title: string;
@@ -380,11 +384,12 @@ function addFootnotesToChapter(
  * Write chapter to markdown file
  */
 function writeChapterFile(
+  volumesDir: string,
   volumeNumber: string,
   chapter: Chapter,
   footnotes: Map<string, string>
 ): void {
-  const volumeDir = join(projectRoot, 'src', 'content', 'volumes', `volume-${volumeNumber}`);
+  const volumeDir = join(volumesDir, `volume-${volumeNumber}`);
 
   // Ensure directory exists
   if (!existsSync(volumeDir)) {
@@ -445,8 +450,8 @@ function parseFb2(inputPath: string, volumeNumber: string): ParsedVolume {
 /**
  * Write volume metadata
  */
-function writeVolumeMeta(volumeNumber: string, title: string): void {
-  const volumeDir = join(projectRoot, 'src', 'content', 'volumes', `volume-${volumeNumber}`);
+function writeVolumeMeta(volumesDir: string, volumeNumber: string, title: string): void {
+  const volumeDir = join(volumesDir, `volume-${volumeNumber}`);
 
   if (!existsSync(volumeDir)) {
     mkdirSync(volumeDir, { recursive: true });
@@ -469,12 +474,12 @@ function main(): void {
   const args = process.argv.slice(2);
 
   if (args.length < 2) {
-    console.log('Usage: npx tsx scripts/parse-fb2.ts <input.fb2> <volume-number>');
+    console.log('Usage: npx tsx scripts/parse-fb2.ts <input.fb2> <volume-number> [volumes-dir]');
     console.log('\nExample: npx tsx scripts/parse-fb2.ts /tmp/lamrim_4.fb2 4');
     process.exit(1);
   }
 
-  const [inputPath, volumeNumber] = args;
+  const [inputPath, volumeNumber, volumesDir = defaultVolumesDir] = args;
 
   if (!existsSync(inputPath)) {
     console.error(`Error: File not found: ${inputPath}`);
@@ -485,15 +490,15 @@ function main(): void {
     const parsed = parseFb2(inputPath, volumeNumber);
 
     // Write volume metadata
-    writeVolumeMeta(volumeNumber, parsed.title);
+    writeVolumeMeta(volumesDir, volumeNumber, parsed.title);
 
     // Write chapters
     console.log('\nWriting chapter files:');
     for (const chapter of parsed.chapters) {
-      writeChapterFile(volumeNumber, chapter, parsed.footnotes);
+      writeChapterFile(volumesDir, volumeNumber, chapter, parsed.footnotes);
     }
 
-    console.log(`\nDone! Written ${parsed.chapters.length} chapters to volume-${volumeNumber}/`);
+    console.log(`\nDone! Written ${parsed.chapters.length} chapters to ${join(volumesDir, `volume-${volumeNumber}`)}/`);
 
     // Output section definitions for index.ts
     console.log('\n--- Add to src/content/index.ts ---\n');
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Bounded-memory page access for the PDF extraction scripts.
+
+Shared by extract-chapters.py and extract-footnotes.py.
+
+In normal mode a single fitz document stays open for the whole run, as before.
+In low-memory mode:
+- MuPDF's store (cached fonts, images, parsed objects) is trimmed after
+  every page: back under --store-limit on PyMuPDF <= 1.23, which reports the
+  store size; by STORE_SHRINK_PERCENT on 1.24+, where TOOLS.store_size()
+  returns None, so the store stays bounded but not at a byte limit
+- Pages are only handed to a callback (PageReader.process), so no page
+  object outlives its processing
+- Image data is not materialised in get_text("dict") results
+- The document is closed and reopened every N pages, or earlier when the
+  process RSS goes over the configured budget (at most once every
+  BUDGET_RECYCLE_MIN_PAGES pages); reopening cannot free Python heap, so
+  once a reopen leaves RSS over budget only the every-N-pages reopen is kept
+
+Peak RSS is tracked in both modes so the scripts can report it.
+
+Works with PyMuPDF 1.19 and later (TEXTFLAGS_DICT); tested with 1.28.
+"""
+
+import gc
+import os
+import resource
+import sys
+from dataclasses import dataclass
+
+import fitz
+
+
+MB = 1024 * 1024
+
+# Defaults for --low-memory
+DEFAULT_STORE_LIMIT_MB = 64  # MuPDF store cap
+DEFAULT_RECYCLE_PAGES = 100  # Reopen document after this many pages
+BUDGET_RECYCLE_MIN_PAGES = 10  # Pages between reopens triggered by the RSS budget
+STORE_SHRINK_PERCENT = 50  # Per-page trim when the store size cannot be read
+
+
+@dataclass
+class MemoryOptions:
+    """Memory settings for PageReader."""
+    low_memory: bool = False
+    rss_budget_mb: float | None = None  # Recycle early when RSS goes above this
+    store_limit_mb: float = DEFAULT_STORE_LIMIT_MB
+    recycle_pages: int = DEFAULT_RECYCLE_PAGES
+
+
+def current_rss() -> int:
+    """Current resident set size in bytes (falls back to peak RSS)."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return peak_rss()
+
+
+def store_size() -> int | None:
+    """MuPDF store size in bytes, or None where the bindings do not report it."""
+    size = fitz.TOOLS.store_size
+    # A property up to PyMuPDF 1.23; a staticmethod returning None since 1.24
+    if callable(size):
+        size = size()
+    return size
+
+
+def peak_rss() -> int:
+    """Peak resident set size of this process in bytes."""
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, kilobytes on Linux
+    if sys.platform == 'darwin':
+        return maxrss
+    return maxrss * 1024
+
+
+class PageReader:
+    """Open a PDF and hand out pages, keeping memory bounded if asked to."""
+
+    def __init__(self, pdf_path: str, options: MemoryOptions = None):
+        self.pdf_path = pdf_path
+        self.options = options or MemoryOptions()
+        self.doc = fitz.open(pdf_path)
+        self.page_count = len(self.doc)
+        self.pages_since_open = 0
+        self.recycles = 0
+        self.budget_recycling = True  # Off once a budget reopen leaves RSS over budget
+
+        if self.options.low_memory:
+            self._shrink_store()
+
+    def __len__(self) -> int:
+        return self.page_count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def dict_flags(self) -> int | None:
+        """Flags for page.get_text("dict"); image blocks are skipped in low-memory mode."""
+        if self.options.low_memory:
+            return fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+        return None
+
+    def process(self, page_num: int, fn):
+        """
+        Call fn(page) and return its result. The page is released before
+        caches are trimmed, so fn must not return the page or anything
+        holding on to it.
+        """
+        page = self.doc[page_num]
+        try:
+            return fn(page)
+        finally:
+            del page
+            if self.options.low_memory:
+                self._after_page()
+
+    def text(self, page_num: int) -> str:
+        """Plain text of a page."""
+        return self.process(page_num, lambda page: page.get_text())
+
+    def close(self):
+        if self.doc is not None:
+            self.doc.close()
+            self.doc = None
+
+    def _after_page(self):
+        self.pages_since_open += 1
+        self._shrink_store()
+
+        if self.pages_since_open >= self.options.recycle_pages:
+            self._recycle()
+        elif (self.budget_recycling and self.pages_since_open >= BUDGET_RECYCLE_MIN_PAGES
+              and self._over_budget()):
+            self._recycle()
+            if self._over_budget():
+                print(f"Warning: RSS {current_rss() / MB:.0f} MB is still over the "
+                      f"{self.options.rss_budget_mb:.0f} MB budget after reopening the PDF; "
+                      f"the rest is not MuPDF memory, so from now on the PDF is only "
+                      f"reopened every {self.options.recycle_pages} pages", file=sys.stderr)
+                self.budget_recycling = False
+
+    def _over_budget(self) -> bool:
+        return (
+            self.options.rss_budget_mb is not None
+            and current_rss() > self.options.rss_budget_mb * MB
+        )
+
+    def _shrink_store(self):
+        """Shrink MuPDF's store under the configured cap, or by a fixed share if its size is unknown."""
+        size = store_size()
+        if size is None:
+            fitz.TOOLS.store_shrink(STORE_SHRINK_PERCENT)
+            return
+        limit = self.options.store_limit_mb * MB
+        if size > limit:
+            fitz.TOOLS.store_shrink(100 - int(100 * limit / size))
+
+    def _recycle(self):
+        """Close and reopen the document, dropping everything MuPDF cached for it."""
+        self.doc.close()
+        fitz.TOOLS.store_shrink(100)
+        gc.collect()
+        self.doc = fitz.open(self.pdf_path)
+        self.pages_since_open = 0
+        self.recycles += 1
+
+
+def add_memory_arguments(parser):
+    """Add --low-memory and related options to an argparse parser."""
+    group = parser.add_argument_group('memory')
+    group.add_argument('--low-memory', action='store_true',
+                       help='Bound memory use for very large PDFs')
+    group.add_argument('--memory-budget', type=float, metavar='MB',
+                       help='RSS budget in MB; reopen the PDF early when exceeded (implies --low-memory)')
+    group.add_argument('--store-limit', type=float, default=DEFAULT_STORE_LIMIT_MB, metavar='MB',
+                       help=f'MuPDF store cap in MB in low-memory mode, enforced on PyMuPDF <= 1.23 '
+                            f'(default: {DEFAULT_STORE_LIMIT_MB})')
+    group.add_argument('--recycle-pages', type=int, default=DEFAULT_RECYCLE_PAGES, metavar='N',
+                       help=f'Reopen the PDF every N pages in low-memory mode (default: {DEFAULT_RECYCLE_PAGES})')
+
+
+def memory_options_from_args(args) -> MemoryOptions:
+    """Build MemoryOptions from arguments added by add_memory_arguments()."""
+    return MemoryOptions(
+        low_memory=args.low_memory or args.memory_budget is not None,
+        rss_budget_mb=args.memory_budget,
+        store_limit_mb=args.store_limit,
+        recycle_pages=max(1, args.recycle_pages),
+    )
+
+
+def format_memory_report(reader: PageReader) -> str:
+    """One-line summary of peak memory use."""
+    report = f"Peak RSS: {peak_rss() / MB:.1f} MB"
+    if reader.options.low_memory:
+        report += f" (low-memory mode, document reopened {reader.recycles} times)"
+        if reader.options.rss_budget_mb is not None:
+            report += f", budget {reader.options.rss_budget_mb:.0f} MB"
+    return report
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Publish extracted content as a numbered release with delta bundles.
+
+Compares src/content with the previous release and writes:
+- releases/v{N}/...            full snapshot of the content files
+- releases/deltas/{N-1}-{N}.json  patch from the previous release
+- releases/manifest.json       list of releases, file hashes and deltas
+
+A client that has release N-1 applies the delta bundle to get release N.
+Each changed file gets one of these entries in the bundle:
+- "paragraphs": chapter .md as paragraphs (split on blank lines);
+  ops are ["=", start, end] to copy old paragraphs, ["+", [text, ...]] to insert
+- "footnotes": footnotes.json as {"set": {num: text}, "delete": [num, ...]},
+  plus "order": [num, ...] only when the new file is not in ascending order
+- "full": fetch the file from v{N}/ (new file, or delta not smaller than the file)
+- "deleted": file removed
+
+Every delta is applied and checked against the new file's sha256 before it is
+written; if the result does not match byte for byte, the file falls back to "full".
+"""
+
+import difflib
+import hashlib
+import json
+import os
+import shutil
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+BUNDLE_FORMAT = 1
+PARAGRAPH_SEPARATOR = '\n\n'
+FOOTNOTES_FILE = 'footnotes.json'
+
+
+def sha256(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def encoded_size(obj) -> int:
+    """Size of an object as it is written into a bundle."""
+    return len(json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+
+def collect_content_files(content_dir: Path) -> dict:
+    """Read all published content files: {relative_path: text}."""
+    files = {}
+
+    footnotes_path = content_dir / FOOTNOTES_FILE
+    if footnotes_path.exists():
+        files[FOOTNOTES_FILE] = footnotes_path.read_text(encoding='utf-8')
+
+    for volume_dir in sorted((content_dir / 'volumes').iterdir()):
+        if not volume_dir.is_dir():
+            continue
+        for path in sorted(volume_dir.glob('*.md')) + sorted(volume_dir.glob('_meta.json')):
+            files[path.relative_to(content_dir).as_posix()] = path.read_text(encoding='utf-8')
+
+    return files
+
+
+def diff_paragraphs(old: str, new: str) -> list:
+    """Paragraph-level ops that turn old into new."""
+    old_paras = old.split(PARAGRAPH_SEPARATOR)
+    new_paras = new.split(PARAGRAPH_SEPARATOR)
+
+    matcher = difflib.SequenceMatcher(None, old_paras, new_paras, autojunk=False)
+    ops = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append(['=', i1, i2])
+        elif tag in ('replace', 'insert'):
+            ops.append(['+', new_paras[j1:j2]])
+        # 'delete': old paragraphs are simply not copied
+    return ops
+
+
+def apply_paragraphs(old: str, ops: list) -> str:
+    """Apply paragraph ops from diff_paragraphs()."""
+    old_paras = old.split(PARAGRAPH_SEPARATOR)
+    result = []
+    for op in ops:
+        if op[0] == '=':
+            result.extend(old_paras[op[1]:op[2]])
+        else:
+            result.extend(op[1])
+    return PARAGRAPH_SEPARATOR.join(result)
+
+
+def diff_footnotes(old: str, new: str) -> dict:
+    """Footnote-level delta between two footnotes.json texts."""
+    old_notes = json.loads(old)
+    new_notes = json.loads(new)
+    delta = {
+        'set': {num: text for num, text in new_notes.items() if old_notes.get(num) != text},
+        'delete': [num for num in old_notes if num not in new_notes],
+    }
+    if list(new_notes) != sorted(new_notes, key=int):
+        delta['order'] = list(new_notes)
+    return delta
+
+
+def apply_footnotes(old: str, delta: dict) -> str:
+    """Apply a delta from diff_footnotes(); output matches extract-footnotes.py."""
+    notes = json.loads(old)
+    for num in delta['delete']:
+        notes.pop(num, None)
+    notes.update(delta['set'])
+    # extract-footnotes.py writes notes in ascending order
+    order = delta.get('order') or sorted(notes, key=int)
+    return json.dumps({num: notes[num] for num in order}, ensure_ascii=False, indent=2)
+
+
+def apply_entry(old: str | None, entry: dict) -> str | None:
+    """Apply one bundle entry to a file; None means the new text must be fetched in full."""
+    if entry['type'] == 'paragraphs':
+        return apply_paragraphs(old, entry['ops'])
+    if entry['type'] == 'footnotes':
+        return apply_footnotes(old, entry['delta'])
+    return None
+
+
+def make_entry(path: str, old: str | None, new: str) -> dict:
+    """Smallest verified bundle entry for a changed file."""
+    full = {'path': path, 'type': 'full', 'sha256': sha256(new)}
+    if old is None:
+        return full
+
+    if path == FOOTNOTES_FILE:
+        entry = {'path': path, 'type': 'footnotes', 'sha256': sha256(new), 'delta': diff_footnotes(old, new)}
+    else:
+        entry = {'path': path, 'type': 'paragraphs', 'sha256': sha256(new), 'ops': diff_paragraphs(old, new)}
+
+    if encoded_size(entry) >= len(new.encode('utf-8')):
+        return full
+    if apply_entry(old, entry) != new:
+        print(f"  Warning: delta for {path} does not round-trip, publishing full file", file=sys.stderr)
+        return full
+    return entry
+
+
+def self_check():
+    """Check that typical footnote edits publish as small deltas, not full files."""
+    def dump(notes):
+        return json.dumps(notes, ensure_ascii=False, indent=2)
+
+    notes = {str(n): f'Примечание {n}.' for n in range(1, 201)}
+    without_7 = {num: text for num, text in notes.items() if num != '7'}
+    reordered = dict(reversed(list(notes.items())))
+
+    cases = [
+        ('restored footnote', dump(without_7), dump(notes)),
+        ('removed footnote', dump(notes), dump(without_7)),
+        ('edited footnote', dump(notes), dump({**notes, '50': 'Исправлено.'})),
+        ('reordered file', dump(notes), dump(reordered)),
+    ]
+    failed = False
+    for name, old, new in cases:
+        entry = make_entry(FOOTNOTES_FILE, old, new)
+        ok = entry['type'] == 'footnotes' and apply_entry(old, entry) == new
+        print(f"  {name}: {entry['type']} {'ok' if ok else 'FAIL'}")
+        failed = failed or not ok
+
+    if failed:
+        sys.exit(1)
+
+
+def load_manifest(releases_dir: Path) -> dict:
+    manifest_path = releases_dir / 'manifest.json'
+    if manifest_path.exists():
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {'format': BUNDLE_FORMAT, 'latest': 0, 'releases': []}
+
+
+def load_release_files(releases_dir: Path, release: dict) -> dict:
+    """Read the files of a published release snapshot."""
+    release_dir = releases_dir / f"v{release['version']}"
+    return {path: (release_dir / path).read_text(encoding='utf-8') for path in release['files']}
+
+
+def write_snapshot(releases_dir: Path, version: int, files: dict):
+    release_dir = releases_dir / f'v{version}'
+    if release_dir.exists():
+        shutil.rmtree(release_dir)
+    for path, text in files.items():
+        target = release_dir / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(text, encoding='utf-8')
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Publish content release with delta bundles')
+    parser.add_argument('--content-dir', default='src/content', help='Extracted content directory')
+    parser.add_argument('--releases-dir', default='releases', help='Output directory for releases')
+    parser.add_argument('--dry-run', action='store_true', help='Show changes without writing a release')
+    parser.add_argument('--self-check', action='store_true', help='Check footnote delta round-trips and exit')
+
+    args = parser.parse_args()
+
+    if args.self_check:
+        self_check()
+        return
+
+    content_dir = Path(args.content_dir)
+    releases_dir = Path(args.releases_dir)
+
+    new_files = collect_content_files(content_dir)
+    manifest = load_manifest(releases_dir)
+    previous = manifest['releases'][-1] if manifest['releases'] else None
+    old_files = load_release_files(releases_dir, previous) if previous else {}
+
+    version = manifest['latest'] + 1
+    print(f"Loaded {len(new_files)} content files from {content_dir}")
+
+    entries = []
+    for path, text in new_files.items():
+        old = old_files.get(path)
+        if old != text:
+            entries.append(make_entry(path, old, text))
+    for path in old_files:
+        if path not in new_files:
+            entries.append({'path': path, 'type': 'deleted'})
+
+    if previous and not entries:
+        print(f"No changes since release {previous['version']}")
+        return
+
+    bundle = {'format': BUNDLE_FORMAT, 'from': previous['version'] if previous else 0, 'to': version, 'files': entries}
+    bundle_size = encoded_size(bundle)
+
+    print(f"\nRelease {version}: {len(entries)} changed files")
+    for entry in entries:
+        print(f"  {entry['path']}: {entry['type']}")
+    if previous:
+        full_size = sum(len(new_files[e['path']].encode('utf-8')) for e in entries if e['type'] != 'deleted')
+        fetch_size = sum(len(new_files[e['path']].encode('utf-8')) for e in entries if e['type'] == 'full')
+        print(f"\nDelta bundle: {bundle_size / 1024:.1f} KB (+ {fetch_size / 1024:.1f} KB full files), "
+              f"changed files in full: {full_size / 1024:.1f} KB")
+
+    if args.dry_run:
+        print("\n(Dry run - no release written)")
+        return
+
+    write_snapshot(releases_dir, version, new_files)
+
+    release = {
+        'version': version,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'files': {path: {'sha256': sha256(text), 'size': len(text.encode('utf-8'))}
+                  for path, text in new_files.items()},
+    }
+    if previous:
+        delta_name = f"deltas/{previous['version']}-{version}.json"
+        delta_path = releases_dir / delta_name
+        delta_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(delta_path, 'w', encoding='utf-8') as f:
+            json.dump(bundle, f, ensure_ascii=False, separators=(',', ':'))
+        release['delta'] = {'from': previous['version'], 'path': delta_name, 'size': bundle_size}
+
+    manifest['latest'] = version
+    manifest['releases'].append(release)
+
+    os.makedirs(releases_dir, exist_ok=True)
+    with open(releases_dir / 'manifest.json', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    print(f"\nSaved release {version} to {releases_dir}")
+
+
+if __name__ == "__main__":
+    main()